@@ -0,0 +1,46 @@
+"""
+Module `fw_kernels`.
+
+Noyaux compilés avec Numba pour l'algorithme de Floyd-Warshall.
+Numba est une dépendance optionnelle : s'il n'est pas installé,
+`fw` vaut `None` et `Graph` utilise la version NumPy.
+"""
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def fw(D, inf):
+        """
+        Floyd-Warshall en place sur la matrice carrée `D` (distances
+        seulement, pas de prédécesseurs), où `inf` représente l'absence
+        de chemin. Comme dans `Graph._relax_pivot`, les sommes sont
+        saturées à -inf pour qu'un cycle négatif ne fasse pas déborder
+        les entiers.
+
+        Seule la boucle sur i est parallélisée (`prange`) : la boucle
+        sur k est séquentielle par nature et la ligne `D[k]` n'est pas
+        modifiée pendant l'itération k en l'absence de cycle négatif.
+        """
+
+        n = D.shape[0]
+        for k in range(n):
+            Dk = D[k]
+            for i in prange(n):
+                dik = D[i, k]
+                if dik == inf:
+                    continue
+                Di = D[i]
+                for j in range(n):
+                    dkj = Dk[j]
+                    if dkj == inf:
+                        continue
+                    v = max(dik + dkj, -inf)
+                    if v < Di[j]:
+                        Di[j] = v
+else:
+    fw = None
@@ -7,6 +7,15 @@ reconstruit des chemins optimaux.
 """
 
 import os
+from itertools import islice
+
+import numpy as np
+
+try:
+    from scipy.sparse.csgraph import (NegativeCycleError, csgraph_from_dense,
+                                      floyd_warshall as scipy_floyd_warshall)
+except ImportError:
+    scipy_floyd_warshall = None
 
 
 class Graph:
@@ -15,13 +24,31 @@ class Graph:
         self.num_vertices = 0
         # Matrice des distances courantes
         self.L = []
-        # Matrice des prédécesseurs / listes de prédécesseurs pour
-        # reconstruire les chemins les plus courts (P)
-        self.P = []
+        # Copie NumPy de L sur laquelle travaille l'algorithme ; `L` n'en
+        # est que le miroir en listes pour l'affichage. Les poids étant
+        # entiers, D est un tableau d'entiers (voir `_distance_dtype`)
+        self.D = np.empty((0, 0))
+        # Matrice des prédécesseurs pour reconstruire les chemins les
+        # plus courts (P) : P[i, j] est un masque de bits (mots uint64)
+        # où le bit u est à 1 si u est un prédécesseur de j sur i->j
+        self.P = np.zeros((0, 0, 0), dtype=np.uint64)
         # Matrice d'adjacence initiale telle que lue depuis le fichier
         self.initial_adj = []
+        # Poids des arêtes (NumPy), INF s'il n'y a pas d'arête, y compris
+        # sur la diagonale (une boucle u->u n'existe que si elle est lue)
+        self.W = np.empty((0, 0))
         # Constante représentant l'infini (pas de lien)
         self.INF = float('inf')
+        # Valeur de l'infini dans D et W (finie pour un type entier)
+        self._inf = np.inf
+        # Affiche les matrices après chaque itération k de `floyd_warshall`
+        self.debug = False
+        # Chemins optimaux déjà reconstruits, par couple (start, end) ;
+        # vidé à chaque rechargement ou nouvelle exécution
+        self._paths_cache = {}
+        # Témoin (i, k) d'un cycle négatif relevé par `_run_pivots` :
+        # D[i][i] est devenu négatif à l'itération k
+        self._neg_witness = None
 
     def load_from_file(self, filename):
         """
@@ -32,11 +59,13 @@ class Graph:
         - deuxième ligne : nombre d'arêtes
         - lignes suivantes : triplets `u v w` (u->v avec poids w)
 
-        Cette méthode initialise :
+        Cette méthode initialise (via `reset`) :
         - `self.num_vertices`,
         - `self.L` comme matrice des distances (INF sauf diagonale = 0),
-        - `self.P` comme matrice de listes de prédécesseurs,
-        - `self.initial_adj` comme matrice d'adjacence d'origine.
+        - `self.D` comme copie NumPy de `self.L`,
+        - `self.P` comme matrice de masques de prédécesseurs,
+        - `self.initial_adj` comme matrice d'adjacence d'origine,
+        - `self.W` comme matrice NumPy des poids des arêtes.
 
         Retourne `True` si la lecture a réussi, `False` sinon.
         """
@@ -50,71 +79,224 @@ class Graph:
 
         try:
             with open(file_path, 'r') as f:
-                # Lire et nettoyer les lignes vides
-                lines = [l.strip() for l in f.readlines() if l.strip()]
-                if not lines:
+                # Lignes non vides, lues au fil de l'eau (sans tout
+                # charger en mémoire)
+                lines = (l for l in map(str.strip, f) if l)
+                first = next(lines, None)
+                if first is None:
                     return False
 
                 # Lecture basique des entêtes
-                self.num_vertices = int(lines[0])
-                num_edges = int(lines[1])
-
-                # Initialisations : L et initial_adj prennent INF,
-                # P contient des listes vides (aucun prédécesseur connu)
-                self.L = [[self.INF] * self.num_vertices for _ in range(self.num_vertices)]
-                self.P = [[[] for _ in range(self.num_vertices)] for _ in range(self.num_vertices)]
-                self.initial_adj = [[self.INF] * self.num_vertices for _ in range(self.num_vertices)]
-
-                # distance zéro sur la diagonale (même sommet)
-                for i in range(self.num_vertices):
-                    self.L[i][i] = 0
-                    self.initial_adj[i][i] = 0
-
-                # Remplir les arêtes à partir des lignes suivantes
-                for i in range(num_edges):
-                    if 2 + i < len(lines):
-                        parts = list(map(int, lines[2 + i].split()))
-                        u, v, w = parts[0], parts[1], parts[2]
-                        self.L[u][v] = w
-                        self.initial_adj[u][v] = w
-                        # P[u][v] contient les prédécesseurs immédiats
-                        if u not in self.P[u][v]:
-                            self.P[u][v].append(u)
+                n = int(first)
+                num_edges = int(next(lines))
+
+                # Lire les arêtes des lignes suivantes
+                edges = [tuple(map(int, line.split()[:3]))
+                         for line in islice(lines, num_edges)]
+
+            self.reset(n, edges)
             return True
         except Exception:
             # En cas d'erreur de parsing ou d'E/S, signaler l'échec
             return False
 
+    def reset(self, n, edges=()):
+        """
+        Réinitialise le graphe avec `n` sommets et les arêtes `edges`
+        (triplets `(u, v, w)`), avant exécution de l'algorithme.
+
+        Les tableaux NumPy `W`, `P` et `D` sont remplis en place quand
+        leur taille et leur type conviennent déjà : charger à la suite
+        des graphes de même taille ne réalloue pas les matrices.
+        """
+
+        dtype, inf = self._distance_dtype(n, [w for _, _, w in edges])
+        self.num_vertices = n
+        self._inf = inf
+        self._paths_cache = {}
+        self._neg_witness = None
+
+        # Initialisations : W prend INF (aucune arête),
+        # P des masques vides (aucun prédécesseur connu)
+        if self.W.shape == (n, n) and self.W.dtype == dtype:
+            self.W.fill(inf)
+            self.P.fill(0)
+        else:
+            self.W = np.full((n, n), inf, dtype=dtype)
+            self.P = self._empty_predecessors(n)
+
+        for u, v, w in edges:
+            self.W[u, v] = w
+            # P[u][v] contient les prédécesseurs immédiats
+            self.P[u, v, u >> 6] |= np.uint64(1 << (u & 63))
+
+        # distance zéro sur la diagonale (même sommet), sauf boucle
+        # u->u lue dans le fichier
+        if self.D.shape == (n, n) and self.D.dtype == dtype:
+            self.D[...] = self.W
+        else:
+            self.D = self.W.copy()
+        idx = np.arange(n)
+        diag = self.W[idx, idx]
+        self.D[idx, idx] = np.where(diag == inf, 0, diag)
+
+        self._sync_l()
+        self.initial_adj = [list(row) for row in self.L]
+
     def floyd_warshall(self):
         """
         Exécution standard de l'algorithme de Floyd-Warshall.
 
         Met à jour la matrice `self.L` (distances minimales) et la
-        matrice `self.P` (prédécesseurs) en parcourant les k,i,j.
+        matrice `self.P` (prédécesseurs) en parcourant les k ; pour
+        chaque k, la mise à jour de tous les couples (i,j) est faite
+        d'un seul coup par NumPy (voir `_relax_pivot`).
         Lorsqu'une distance plus courte est trouvée pour i->j via k,
-        on remplace la liste des prédécesseurs. Si la même distance
-        est trouvée, on ajoute les prédécesseurs alternatifs.
+        on remplace le masque des prédécesseurs. Si la même distance
+        est trouvée, on y ajoute (OU binaire) les prédécesseurs
+        alternatifs.
+
+        Hors mode `debug`, les distances sont d'abord calculées par un
+        moteur compilé (`_compiled_distances` : SciPy ou Numba) et
+        `self.P` est reconstruite ensuite (`_rebuild_predecessors`).
+        Sans moteur disponible, ou en présence d'un cycle négatif, on
+        fait le calcul pas à pas, qui garde les prédécesseurs
+        nécessaires à la reconstruction du cycle.
+        """
+
+        self._paths_cache = {}
+        if not self.debug:
+            D = self._compiled_distances()
+            if D is not None and self._adopt_distances(D):
+                return
+        self._run_pivots()
+
+    def _compiled_distances(self):
+        """
+        Distances finales (sans prédécesseurs) calculées à partir de
+        `self.D` par un moteur compilé, dans un nouveau tableau :
+
+        - `scipy.sparse.csgraph.floyd_warshall` (C, sans temps de
+          compilation) si SciPy est installé et que D tient exactement
+          en float64 (int32 seulement) ;
+        - sinon le noyau Numba `fw_kernels.fw` s'il est disponible et
+          que D est un tableau d'entiers machine (pas d'entiers Python).
+          Numba n'est importé qu'à ce moment : son chargement coûte plus
+          que tout le reste du module, et avec SciPy il ne sert qu'aux
+          poids trop grands pour int32.
+
+        Retourne `None` si aucun moteur n'est utilisable ou si SciPy
+        signale un cycle négatif.
+        """
+
+        inf = self._inf
+        if scipy_floyd_warshall is not None and self.D.dtype == np.int32:
+            dense = np.where(self.D == inf, np.inf, self.D).astype(np.float64)
+            # null_value=inf : les arêtes de poids 0 restent des arêtes
+            graph = csgraph_from_dense(dense, null_value=np.inf)
+            try:
+                dist = scipy_floyd_warshall(graph, directed=True)
+            except NegativeCycleError:
+                return None
+            # SciPy met la diagonale à 0 ; une boucle u->u lue dans le
+            # fichier garde, comme ici, le plus court cycle passant par u
+            loops = np.flatnonzero(np.diag(dense) != 0)
+            if loops.size:
+                weights = np.where(self.W == inf, np.inf, self.W)
+                dist[loops, loops] = (dist[loops, :] + weights[:, loops].T).min(axis=1)
+            return np.where(np.isinf(dist), inf, dist).astype(self.D.dtype)
+        if self.D.dtype != object:
+            from fw_kernels import fw
+            if fw is not None:
+                D = self.D.copy()
+                fw(D, inf)
+                return D
+        return None
+
+    @staticmethod
+    def _distance_dtype(n, weights):
+        """
+        Choisit le type de D et W d'après les poids (entiers) lus.
+
+        Un plus court chemin compte au plus n arêtes : si n * max|w|
+        tient largement dans int32, on prend int32 (deux fois plus de
+        valeurs par registre SIMD et moitié moins de mémoire qu'en
+        float64), sinon int64. Au-delà, D et W contiennent des entiers
+        Python (dtype objet) : le calcul reste exact, comme avec des
+        listes, mais sans noyau compilé (un float64 arrondirait les
+        poids au-delà de 2**53).
+
+        Retourne `(dtype, inf)` ; l'infini vaut max // 2 du type, pour
+        que INF + INF (et -INF - INF) ne déborde jamais, et `INF` pour
+        les entiers Python.
+        """
+
+        bound = max(n, 1) * max((abs(w) for w in weights), default=0)
+        for dtype in (np.int32, np.int64):
+            inf = int(np.iinfo(dtype).max // 2)
+            if bound < inf // 2:
+                return dtype, inf
+        return object, np.inf
+
+    def _adopt_distances(self, D):
+        """
+        Adopte les distances finales `D` calculées sans prédécesseurs
+        (moteur compilé) et reconstruit `self.P`.
+
+        Retourne `False` sans rien modifier si `D` révèle un cycle
+        négatif : l'appelant refait alors le calcul pas à pas.
         """
 
+        if (np.diag(D) < 0).any():
+            return False
+        self.D = D
+        self._rebuild_predecessors()
+        self._sync_l()
+        return True
+
+    def _run_pivots(self):
+        # Floyd-Warshall pas à pas (distances et prédécesseurs). Dès
+        # qu'une distance i->i devient négative, on s'arrête en gardant
+        # le témoin du cycle (voir `get_negative_cycle_path`)
         n = self.num_vertices
+        self._neg_witness = self._find_witness(None)
         for k in range(n):
-            for i in range(n):
-                for j in range(n):
-                    # vérifier qu'il existe un chemin i->k et k->j
-                    if self.L[i][k] != self.INF and self.L[k][j] != self.INF:
-                        new_dist = self.L[i][k] + self.L[k][j]
-                        if new_dist < self.L[i][j]:
-                            # distance strictement meilleure : remplacer
-                            self.L[i][j] = new_dist
-                            self.P[i][j] = []
-                            # copier (uniquement) les prédécesseurs de k->j
-                            self._add_unique(self.P[i][j], self.P[k][j])
-                        elif new_dist == self.L[i][j]:
-                            # distance égale : ajouter d'autres prédécesseurs
-                            self._add_unique(self.P[i][j], self.P[k][j])
-                            
-                            
-                    print("k: ", k, "| i:", i, "| j:", j, "\n\n", self._format_matrix_l(), "\n", self._format_matrix_p(), "\n----------------------\n")
+            if self._neg_witness is not None:
+                break
+            self._relax_pivot(k)
+            if self.debug:
+                self._sync_l()
+                print("k: ", k, "\n\n", self._format_matrix_l(), "\n", self._format_matrix_p(), "\n----------------------\n")
+            self._neg_witness = self._find_witness(k)
+        self._sync_l()
+
+    def _find_witness(self, k):
+        # (i, k) si une distance i->i est négative après l'itération k,
+        # (i, i) pour une boucle négative présente dès le départ (k None)
+        diag = np.diag(self.D)
+        if not (diag < 0).any():
+            return None
+        i = int(np.argmin(diag))
+        return (i, i if k is None else k)
+
+    def _use_exact_ints(self):
+        """
+        Passe D et W en entiers Python (dtype objet), l'infini devenant
+        `INF`.
+
+        La borne n * max|w| de `_distance_dtype` ne vaut qu'en l'absence
+        de cycle négatif : dès qu'une distance i->i devient négative, les
+        distances peuvent décroître sans limite au fil des itérations et
+        seraient sinon saturées à -INF. Jusque-là, aucune somme n'atteint
+        -INF : les valeurs converties sont exactes.
+        """
+
+        for name in ('D', 'W'):
+            M = getattr(self, name)
+            exact = M.astype(object)
+            exact[M == self._inf] = np.inf
+            setattr(self, name, exact)
+        self._inf = np.inf
 
     def run_with_trace(self):
         
@@ -122,171 +304,457 @@ class Graph:
         Exécute l'algorithme en enregistrant un trace textuelle détaillée
         à chaque itération sur k
 
+        Renvoie la trace complète sous forme d'une seule chaîne ; voir
+        `run_with_trace_iter` pour la produire morceau par morceau.
         """
 
-        trace = []
-        trace.append("INITIAL STATE:")
-        trace.append(self.get_matrices_string())
-        trace.append("-" * 40)
+        return "\n".join(self.run_with_trace_iter())
+
+    def run_with_trace_iter(self):
+        """
+        Générateur produisant la trace de `run_with_trace` morceau par
+        morceau (sans fin de ligne), pour l'écrire au fil de l'eau sans
+        garder toute la trace en mémoire.
+
+        Les textes des cases de L et P sont gardés d'une itération à
+        l'autre : seules les cases touchées par l'itération k (distance
+        améliorée ou prédécesseurs ajoutés) sont reformatées.
+
+        La trace couvre tous les k, même après l'apparition d'un cycle
+        négatif : le premier témoin est relevé au passage (comme dans
+        `_run_pivots`) et le cycle reconstruit aussitôt, tant que P est
+        encore cohérent avec lui.
+        """
 
+        self._paths_cache = {}
+        self._neg_witness = self._find_witness(None)
+        cycle = self.get_negative_cycle_path() if self._neg_witness else []
         n = self.num_vertices
+        l_cells = [[self._l_cell(val) for val in row] for row in self.L]
+        p_cells = [[self._p_cell(i, j) for j in range(n)] for i in range(n)]
+
+        yield "INITIAL STATE:"
+        yield self.get_matrices_string(l_cells, p_cells)
+        yield "-" * 40
+
         for k in range(n):
-            for i in range(n):
-                for j in range(n):
-                    if self.L[i][k] != self.INF and self.L[k][j] != self.INF:
-                        new_dist = self.L[i][k] + self.L[k][j]
-                        if new_dist < self.L[i][j]:
-                            self.L[i][j] = new_dist
-                            self.P[i][j] = []
-                            self._add_unique(self.P[i][j], self.P[k][j])
-                        elif new_dist == self.L[i][j]:
-                            self._add_unique(self.P[i][j], self.P[k][j])
+            touched = self._relax_pivot(k)
+            # relu après l'itération : D a pu passer en entiers Python
+            # (voir `_use_exact_ints`)
+            inf = self._inf
+            for i, j in zip(*np.nonzero(touched)):
+                val = self.D[i, j]
+                self.L[i][j] = self.INF if val == inf else int(val)
+                l_cells[i][j] = self._l_cell(self.L[i][j])
+                p_cells[i][j] = self._p_cell(i, j)
+            if self._neg_witness is None:
+                self._neg_witness = self._find_witness(k)
+                if self._neg_witness is not None:
+                    cycle = self.get_negative_cycle_path()
 
             # État enregistré après la fin de l'itération sur k
-            trace.append(f"\nState after k = {k} (Processing node {k}):")
-            trace.append(self.get_matrices_string())
-            trace.append("-" * 40)
+            yield f"\nState after k = {k} (Processing node {k}):"
+            yield self.get_matrices_string(l_cells, p_cells)
+            yield "-" * 40
 
         # Vérifier la présence d'un circuit absorbant négatif
         if self.has_negative_cycle():
-            trace.append("\nRESULT: NEGATIVE ABSORBING CIRCUIT DETECTED!")
-            cycle = self.get_negative_cycle_path()
-            trace.append(f"Cycle Path: {cycle}")
+            yield "\nRESULT: NEGATIVE ABSORBING CIRCUIT DETECTED!"
+            yield f"Cycle Path: {cycle or self.get_negative_cycle_path()}"
+        else:
+            yield "\nRESULT: No negative cycles."
+
+    def _relax_pivot(self, k):
+        """
+        Itération k de Floyd-Warshall, vectorisée sur tous les (i,j).
+
+        La somme `D[:, k] + D[k, :]` est calculée par diffusion NumPy
+        (somme min-plus extérieure), puis `D` est mis à jour en place.
+        Les masques de prédécesseurs suivent avec deux opérations
+        vectorisées : copie de P[k, j] là où la distance s'améliore,
+        union (OU binaire) avec P[k, j] là où elle est égale.
+
+        Seules les lignes i avec un chemin i->k et les colonnes j avec
+        un chemin k->j peuvent changer. Si ce sous-bloc est petit (moins
+        de la moitié de la matrice, graphes peu connexes), le calcul y
+        est restreint (`np.ix_`). Sinon, rassembler puis réécrire ses
+        copies de D et P coûterait plus que le travail évité : on
+        travaille sur des vues de toute la matrice, les sommes passant
+        par un INF étant remises à INF.
+
+        Retourne le masque des cases (i,j) touchées par l'itération.
+        """
+
+        n = self.num_vertices
+        D = self.D
+        if (np.diag(D) < 0).any() and D.dtype != object:
+            # cycle négatif : les distances vont décroître sans borne
+            # et sortiraient du type entier, on passe au calcul exact
+            self._use_exact_ints()
+            D = self.D
+        if D[k, k] < 0:
+            return self._relax_pivot_inplace(k)
+        inf = self._inf
+        col = D[:, k]
+        row = D[k, :]
+        rows = np.flatnonzero(col != inf)
+        cols = np.flatnonzero(row != inf)
+        touched = np.zeros((n, n), dtype=bool)
+        if rows.size == 0 or cols.size == 0:
+            return touched
+
+        sub_block = 2 * rows.size * cols.size < n * n
+        if sub_block:
+            idx = np.ix_(rows, cols)
+            # i->k et k->j existent : la somme est finie
+            cand = col[rows, None] + row[None, cols]
+            row_k = self.P[k, cols]
         else:
-            trace.append("\nRESULT: No negative cycles.")
+            idx = (slice(None), slice(None))
+            cand = col[:, None] + row[None, :]
+            if rows.size < n or cols.size < n:
+                np.copyto(cand, inf, where=(col == inf)[:, None] | (row == inf)[None, :])
+            # prédécesseurs de k->j tels qu'au début de l'itération
+            row_k = self.P[k].copy()
+        # saturation à -INF, pour que les cycles négatifs ne fassent pas
+        # déborder les entiers
+        np.maximum(cand, -inf, out=cand)
+
+        sub = D[idx]
+        better = cand < sub
+        # égalité uniquement si i->k et k->j existent
+        equal = (cand == sub) & (cand != inf)
+        np.minimum(sub, cand, out=sub)
+
+        p_sub = self.P[idx]
+        np.copyto(p_sub, row_k, where=better[:, :, None])
+        np.bitwise_or(p_sub, row_k, out=p_sub, where=equal[:, :, None])
+
+        if sub_block:
+            # `np.ix_` renvoie des copies : réécrire le sous-bloc
+            D[idx] = sub
+            self.P[idx] = p_sub
+        touched[idx] = better | equal
+        return touched
+
+    def _relax_pivot_inplace(self, k):
+        """
+        Itération k case par case, dans l'ordre (i, j), chaque case
+        lisant les valeurs déjà mises à jour (y compris celles de la
+        ligne k modifiées plus tôt dans l'itération).
+
+        Elle n'est utilisée que si D[k, k] < 0 (cycle négatif passant
+        par k) : la ligne et la colonne k changent alors pendant
+        l'itération elle-même, et la version vectorisée, qui lit leur
+        état du début de l'itération, donnerait d'autres matrices
+        intermédiaires (trace). Sinon les deux versions coïncident.
 
-        return "\n".join(trace)
+        Retourne le masque des cases (i,j) touchées par l'itération.
+        """
+
+        n = self.num_vertices
+        inf = self._inf
+        D = self.D.tolist()
+        P = self.P.tolist()
+        touched = np.zeros((n, n), dtype=bool)
+        Dk, Pk = D[k], P[k]
+        for i in range(n):
+            Di, Pi = D[i], P[i]
+            if Di[k] == inf:
+                continue
+            for j in range(n):
+                if Dk[j] == inf:
+                    continue
+                new_dist = max(Di[k] + Dk[j], -inf)
+                if new_dist < Di[j]:
+                    Di[j] = new_dist
+                    # P[i, j] prend les prédécesseurs de k->j ; pour
+                    # i == k, la case est sa propre source et se
+                    # retrouve vide
+                    Pi[j] = [0] * len(Pk[j]) if i == k else Pk[j]
+                elif new_dist == Di[j]:
+                    Pi[j] = [a | b for a, b in zip(Pi[j], Pk[j])]
+                else:
+                    continue
+                touched[i, j] = True
+        self.D[...] = D
+        self.P[...] = P
+        return touched
 
-    def _add_unique(self, target_list, source_list):
-        # Ajoute chaque élément de source_list dans target_list sans
-        # doublons (préserve l'ordre d'apparition)
-        for val in source_list:
-            if val not in target_list:
-                target_list.append(val)
+    def _rebuild_predecessors(self):
+        """
+        Reconstruit `self.P` à partir des distances finales `self.D`.
+
+        u est un prédécesseur de j sur un plus court chemin i->j si
+        l'arête u->j existe et D[i,u] + w(u,j) == D[i,j] (avec une
+        distance nulle de i à lui-même). Un seul test vectorisé par
+        sommet u, restreint aux i atteignant u et aux j voisins de u.
+        Valable uniquement sans cycle négatif.
+        """
+
+        n = self.num_vertices
+        D = self.D
+        start = D.copy()
+        np.fill_diagonal(start, 0)
+        self.P = self._empty_predecessors(n)
+        for u in range(n):
+            rows = np.nonzero(start[:, u] != self._inf)[0]
+            cols = np.nonzero(self.W[u] != self._inf)[0]
+            if rows.size == 0 or cols.size == 0:
+                continue
+            hit = start[rows, u:u + 1] + self.W[u, cols] == D[np.ix_(rows, cols)]
+            r, c = np.nonzero(hit)
+            self.P[rows[r], cols[c], u >> 6] |= np.uint64(1 << (u & 63))
+
+    @staticmethod
+    def _empty_predecessors(n):
+        # n x n masques vides, un mot de 64 bits par tranche de 64 sommets
+        return np.zeros((n, n, (n + 63) // 64), dtype=np.uint64)
+
+    def _predecessors(self, i, j):
+        # Décode le masque P[i, j] en liste (croissante) de sommets
+        preds = []
+        for w, m in enumerate(self.P[i, j].tolist()):
+            while m:
+                b = m & -m
+                preds.append(w * 64 + b.bit_length() - 1)
+                m ^= b
+        return preds
+
+    def _sync_l(self):
+        # Recopie `self.D` dans le miroir `self.L` (listes Python, entiers)
+        inf = self._inf
+        self.L = [[self.INF if v == inf else int(v) for v in row]
+                  for row in self.D.tolist()]
 
     def has_negative_cycle(self):
         # Un cycle négatif est détecté si une distance i->i devient négative
-        for i in range(self.num_vertices):
-            if self.L[i][i] < 0:
-                return True
-        return False
+        return bool((np.diag(self.D) < 0).any())
 
     def get_negative_cycle_path(self):
         """
         Tente de reconstruire un chemin représentant un cycle négatif
 
-        - on trouve un sommet `start_node` tel que L[start][start] < 0
+        - si `floyd_warshall` a relevé un témoin (i, k), le cycle est
+          formé des chemins i->k et k->i
+        - sinon, on trouve un sommet `start_node` tel que L[start][start] < 0
         - si une boucle directe de poids négatif existe, la renvoyer
-        - sinon, parcourir la matrice P pour remonter des prédécesseurs
-          et tenter de reconstituer le cycle (avec une garde contre
-          boucles infinies avec `max_steps`)
+        - sinon, se rabattre sur `get_cycle_through_pair`
+
+        Tout cycle renvoyé est validé par `_is_negative_cycle`.
 
         Retourne la liste de sommets formant le cycle (fermé), ou [] si
         impossible.
         """
 
-        start_node = -1
-        for i in range(self.num_vertices):
-            if self.L[i][i] < 0:
-                start_node = i
-                break
-        if start_node == -1:
+        if self._neg_witness is not None:
+            i, k = self._neg_witness
+            if i == k:
+                return [i, i]
+            _, p1 = self.get_path(i, k)
+            _, p2 = self.get_path(k, i)
+            if p1 and p2 and self._is_negative_cycle(p1[:-1] + p2):
+                return p1[:-1] + p2
+
+        negative = np.flatnonzero(np.diag(self.D) < 0)
+        if negative.size == 0:
             return []
+        start_node = int(negative[0])
         # Si la boucle initiale est négative, on retourne simplement [start,start]
         if self.initial_adj[start_node][start_node] < 0:
             return [start_node, start_node]
 
-        path = []
-        # S'il n'y a pas d'information de prédécesseur, on ne peut pas reconstruire
-        if not self.P[start_node][start_node]:
-            return []
-        curr = self.P[start_node][start_node][0]
-        path.append(curr)
-
-        max_steps = self.num_vertices * 2
-        steps = 0
-        # Remonter via les prédécesseurs jusqu'à retrouver start_node
-        while curr != start_node and steps < max_steps:
-            if not self.P[start_node][curr]:
-                break
-            curr = self.P[start_node][curr][0]
-            path.append(curr)
-            steps += 1
+        return self.get_cycle_through_pair()
+
+    def _is_negative_cycle(self, path):
+        # Vrai si `path` est fermé, ne passe que par des arêtes lues
+        # (W différent de INF) et a un poids total négatif
+        if len(path) < 2 or path[0] != path[-1]:
+            return False
+        total = 0
+        for u, v in zip(path, path[1:]):
+            if self.W[u, v] == self._inf:
+                return False
+            total += int(self.W[u, v])
+        return total < 0
+
+    def get_cycle_through_pair(self):
+        """
+        Reconstitution de secours d'un cycle négatif, utilisée par
+        `get_negative_cycle_path` quand le témoin ne suffit pas.
+
+        Cherche en une passe vectorisée les couples (i,k), i != k, tels
+        que L[i][i] < 0 et L[i][k] + L[k][i] < 0, puis concatène les
+        chemins i->k et k->i du premier couple pour lequel le résultat
+        est bien un cycle négatif (voir `_is_negative_cycle`). Retourne
+        [] sinon.
+        """
+
+        D = self.D
+        finite = D != self._inf
+        mask = finite & finite.T & (D + D.T < 0) & (np.diag(D) < 0)[:, None]
+        np.fill_diagonal(mask, False)
+        for i, k in np.argwhere(mask).tolist():
+            _, p1 = self.get_path(i, k)
+            _, p2 = self.get_path(k, i)
+            if p1 and p2 and self._is_negative_cycle(p1[:-1] + p2):
+                return p1[:-1] + p2
+        return []
+
+    def get_path(self, start, end):
+        """
+        Renvoie `(coût, chemin)` pour un plus court chemin de `start`
+        à `end`, en remontant le plus petit prédécesseur de chaque
+        sommet qui n'est pas déjà sur le chemin.
+
+        Un sommet n'étant jamais repris, le parcours compte au plus n
+        étapes, même si P contient des cycles (poids nuls, boucles u->u
+        ou cycle négatif). Le chemin est vide s'il ne peut pas être
+        reconstruit.
+        """
 
+        cost = self.L[start][end]
+        if cost == self.INF:
+            return cost, []
+        path = [end]
+        on_path = {end}
+        curr = end
+        while curr != start:
+            preds = [p for p in self._predecessors(start, curr) if p not in on_path]
+            if not preds:
+                return cost, []
+            curr = preds[0]
+            path.append(curr)
+            on_path.add(curr)
         path.reverse()
-        if path and path[0] != path[-1]:
-            path.append(path[0])
-        return path
+        return cost, path
 
     def get_all_shortest_paths(self, start, end):
         """
-        Reconstruit récursivement toutes les routes optimales de `start` à `end`.
+        Reconstruit toutes les routes optimales de `start` à `end`.
 
-        Utilise la matrice `P` (listes de prédécesseurs) pour obtenir
+        Utilise la matrice `P` (masques de prédécesseurs) pour obtenir
         tous les chemins qui mènent à `end` en respectant les coûts
         minimaux déjà calculés dans `self.L`.
+
+        Les sous-chemins start->pred sont mémoïsés (`_cached_paths`) :
+        chaque couple n'est reconstruit qu'une fois, même lorsque
+        plusieurs routes partagent le même préfixe ou que l'on appelle
+        la méthode pour tous les couples.
+
+        Avec des arêtes de poids nul, P peut contenir un cycle (u
+        prédécesseur de v et v de u, à distance égale) : seules les
+        routes sans sommet répété sont alors renvoyées, via `iter_paths`.
+        """
+
+        paths = self._cached_paths(start, end)
+        if paths is None:
+            return list(self.iter_paths(start, end))
+        return [list(p) for p in paths]
+
+    def _cached_paths(self, start, end):
+        # Version mémoïsée de `get_all_shortest_paths` ; les listes
+        # renvoyées sont partagées avec le cache et ne doivent pas être
+        # modifiées par l'appelant. Parcours en profondeur avec une pile
+        # explicite (pas de récursion) : un sommet n'est mémoïsé qu'une
+        # fois tous ses prédécesseurs mémoïsés. `expanding` contient les
+        # sommets dont les prédécesseurs sont en cours de reconstruction :
+        # en retrouver un signale un cycle dans P, et on renvoie None
+        cache = self._paths_cache
+        stack = [end]
+        expanding = set()
+        while stack:
+            node = stack[-1]
+            key = (start, node)
+            if key in cache:
+                stack.pop()
+                continue
+            if self.L[start][node] == self.INF:
+                cache[key] = []
+                stack.pop()
+                continue
+            if node == start:
+                cache[key] = [[start]]
+                stack.pop()
+                continue
+
+            preds = [p for p in self._predecessors(start, node) if p != node]
+            if node not in expanding:
+                missing = [p for p in preds if (start, p) not in cache]
+                if missing:
+                    if not expanding.isdisjoint(missing):
+                        return None
+                    expanding.add(node)
+                    stack.extend(reversed(missing))
+                    continue
+
+            all_paths = []
+            for pred in preds:
+                for p in cache[(start, pred)]:
+                    all_paths.append(p + [node])
+            cache[key] = all_paths
+            expanding.discard(node)
+            stack.pop()
+        return cache[(start, end)]
+
+    def iter_paths(self, start, end):
+        """
+        Variante itérative et paresseuse de `get_all_shortest_paths`.
+
+        Parcours en profondeur des prédécesseurs avec une pile explicite
+        (pas de récursion) : les routes sont produites une à une, dans
+        le même ordre, sans être toutes gardées en mémoire. Un
+        prédécesseur déjà présent sur la route en cours est ignoré, ce
+        qui borne le parcours malgré les cycles de poids nul.
         """
 
-        all_paths = []
         if self.L[start][end] == self.INF:
-            return all_paths
-        if start == end:
-            return [[start]]
-        for pred in self.P[start][end]:
-            if pred == end:
+            return
+        stack = [(end, [end], {end})]
+        while stack:
+            node, tail, on_tail = stack.pop()
+            if node == start:
+                yield tail[::-1]
                 continue
-            sub_paths = self.get_all_shortest_paths(start, pred)
-            for p in sub_paths:
-                new_p = list(p)
-                new_p.append(end)
-                all_paths.append(new_p)
-        return all_paths
-
-    def get_matrices_string(self):
+            # empilés à l'envers pour sortir dans l'ordre croissant
+            for pred in reversed(self._predecessors(start, node)):
+                if pred not in on_tail:
+                    stack.append((pred, tail + [pred], on_tail | {pred}))
+
+    def get_matrices_string(self, l_cells=None, p_cells=None):
         # Génère une représentation textuelle des matrices L et P
-        res = "Matrix L (Weights):\n" + self._format_matrix_l()
-        res += "\nMatrix P (Predecessors):\n" + self._format_matrix_p()
+        # (à partir de cellules déjà formatées si elles sont fournies)
+        res = "Matrix L (Weights):\n" + self._format_matrix_l(l_cells)
+        res += "\nMatrix P (Predecessors):\n" + self._format_matrix_p(p_cells)
         return res
 
-    def _format_matrix_l(self):
-        lines = []
-        header = "      " + "".join([f"{v:5}" for v in range(self.num_vertices)])
-        lines.append(header)
-        lines.append("     " + "-" * (self.num_vertices * 5))
-        for i in range(self.num_vertices):
-            row_str = f"{i:3} |"
-            for j in range(self.num_vertices):
-                val = self.L[i][j]
-                if val == self.INF:
-                    row_str += f"{'∞':>5}"
-                else:
-                    row_str += f"{val:5}"
-            lines.append(row_str)
-        return "\n".join(lines)
-
-    def _format_matrix_p(self):
-        lines = []
-        col_width = 6
-        formatted_rows = []
-        for i in range(self.num_vertices):
-            row_data = []
-            for j in range(self.num_vertices):
-                preds = self.P[i][j]
-                if not preds:
-                    txt = "ø"
-                elif len(preds) == 1:
-                    txt = str(preds[0])
-                else:
-                    txt = str(preds).replace(" ", "")
-                row_data.append(txt)
-                col_width = max(col_width, len(txt) + 2)
-            formatted_rows.append(row_data)
-        header = "      " + "".join([f"{v:>{col_width}}" for v in range(self.num_vertices)])
-        lines.append(header)
-        lines.append("     " + "-" * (self.num_vertices * col_width))
-        for i in range(self.num_vertices):
-            row_str = f"{i:3} |"
-            for txt in formatted_rows[i]:
-                row_str += f"{txt:>{col_width}}"
-            lines.append(row_str)
-        return "\n".join(lines)
+    def _l_cell(self, val):
+        # Texte (largeur 5) d'une case de L
+        return f"{'∞':>5}" if val == self.INF else f"{val:5}"
+
+    def _p_cell(self, i, j):
+        # Texte (non aligné) d'une case de P
+        preds = self._predecessors(i, j)
+        if not preds:
+            return "ø"
+        if len(preds) == 1:
+            return str(preds[0])
+        return str(preds).replace(" ", "")
+
+    def _format_matrix_l(self, cells=None):
+        n = self.num_vertices
+        if cells is None:
+            cells = [[self._l_cell(val) for val in row] for row in self.L]
+        header = "      " + "".join([f"{v:5}" for v in range(n)])
+        rows = [f"{i:3} |" + "".join(cells[i]) for i in range(n)]
+        return "\n".join([header, "     " + "-" * (n * 5), *rows])
+
+    def _format_matrix_p(self, cells=None):
+        n = self.num_vertices
+        if cells is None:
+            cells = [[self._p_cell(i, j) for j in range(n)] for i in range(n)]
+        col_width = max([6] + [len(txt) + 2 for row in cells for txt in row])
+        header = "      " + "".join([f"{v:>{col_width}}" for v in range(n)])
+        rows = [f"{i:3} |" + "".join([f"{txt:>{col_width}}" for txt in cells[i]])
+                for i in range(n)]
+        return "\n".join([header, "     " + "-" * (n * col_width), *rows])
@@ -11,10 +11,65 @@ import tkinter as tk
 from tkinter import messagebox
 import math
 import os
-import glob
+import re
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from graph_logic import Graph
 
 
+# Instance de Graph réutilisée d'un fichier à l'autre dans chaque
+# processus de calcul des traces (voir `Graph.reset`)
+_worker_graph = None
+
+# Découpe un nom de fichier en blocs de chiffres / non-chiffres
+_DIGITS = re.compile(r'(\d+)')
+
+
+def _natural_key(path):
+    # Clé de tri « naturelle » : test1, test2, test10 (et non test1,
+    # test10, test2), les blocs de chiffres étant comparés en entiers
+    return [int(t) if t.isdigit() else t.lower()
+            for t in _DIGITS.split(os.path.basename(path))]
+
+
+def _trace_one(filename):
+    # Exécuté dans un processus séparé par `generate_all_traces` :
+    # charge le graphe et écrit sa trace au fil de `run_with_trace_iter`
+    # dans un fichier temporaire, dont le chemin est renvoyé (None si
+    # échec du chargement)
+    global _worker_graph
+    if _worker_graph is None:
+        _worker_graph = Graph()
+    g = _worker_graph
+    if not g.load_from_file(filename):
+        return filename, None
+    fd, tmp_path = tempfile.mkstemp(prefix='trace_', suffix='.txt')
+    try:
+        with open(fd, 'w', encoding='utf-8') as f_tmp:
+            sep = ""
+            for chunk in g.run_with_trace_iter():
+                f_tmp.write(sep)
+                f_tmp.write(chunk)
+                sep = "\n"
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return filename, tmp_path
+
+
+def _discard_trace(job):
+    # Supprime le fichier temporaire d'un calcul dont la trace ne sera
+    # pas écrite (génération interrompue par une erreur ou par la
+    # fermeture de la fenêtre)
+    if job.cancelled() or job.exception() is not None:
+        return
+    _, tmp_path = job.result()
+    if tmp_path is not None:
+        os.remove(tmp_path)
+
+
 class FloydApp:
     def __init__(self, root):
         self.root = root
@@ -25,11 +80,27 @@ class FloydApp:
         self.start_node = -1
         self.end_node = -1
         self.current_paths = []
+        self.hl_nodes = set()
+        self.hl_edges = set()
+        self.trace_jobs = None
+        self.trace_file = None
+        self.redraw_pending = False
+        self.drawn_graph = None
+        self.edge_items = {}
+        self.node_items = []
 
         # Variables d'état :
         # - `graph` contient l'instance de Graph chargée
         # - `start_node` / `end_node` servent pour la sélection interactive
         # - `current_paths` contient les chemins affichés en surbrillance
+        # - `hl_nodes` / `hl_edges` : sommets et arêtes de ces chemins,
+        #   tenus à jour par `_set_current_paths`
+        # - `trace_jobs` contient les calculs de traces en cours (ou None)
+        #   et `trace_file` le fichier `trace_execution.txt` ouvert
+        # - `redraw_pending` : un redessin est déjà programmé (after_idle)
+        # - `drawn_graph` / `edge_items` / `node_items` : graphe affiché et
+        #   éléments du canvas correspondants, réutilisés tant que le
+        #   graphe ne change pas (seul leur style est mis à jour)
 
         # --- Layout ---
         top_frame = tk.Frame(root, bg="#ddd", pady=10)
@@ -74,6 +145,14 @@ class FloydApp:
         self.NODE_SIZE = 40
         self.node_positions = []
 
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        # Fermeture de la fenêtre : abandonne la génération des traces
+        # en cours (fichiers temporaires compris) avant de détruire Tk
+        self._cancel_traces()
+        self.root.destroy()
+
     def log(self, message):
         # Écris une ligne dans la zone de log (colonne de droite)
         # La zone est mise en lecture/écriture temporairement pour insérer le texte
@@ -93,10 +172,21 @@ class FloydApp:
         """
         Génère un fichier `trace_execution.txt` pour tous les fichiers
         `.txt` présents dans le dossier `graphs/`. Pour chaque graphe
-        on charge l'instance `Graph`, on exécute `run_with_trace()` et
-        on écrit la trace complète dans le fichier de sortie.
+        on charge l'instance `Graph` et on exécute `run_with_trace_iter()`.
+
+        Les graphes sont indépendants : chacun est traité dans un
+        processus séparé (`ProcessPoolExecutor`) qui écrit sa trace au
+        fil de l'eau dans un fichier temporaire, et l'interface reste
+        réactive pendant le calcul (`_poll_traces` vérifie
+        périodiquement l'avancement et recopie les traces terminées
+        dans l'ordre des fichiers) : aucune trace complète n'est gardée
+        en mémoire.
         """
 
+        if self.trace_jobs is not None:
+            self.log("Trace generation already running...")
+            return
+
         # Localiser le dossier graphs du projet
         base_dir = os.path.dirname(os.path.abspath(__file__))
         project_root = os.path.dirname(base_dir)
@@ -106,46 +196,89 @@ class FloydApp:
             messagebox.showerror("Error", "Graphs folder not found!")
             return
 
-        # 2. Find all txt files
-        files = glob.glob(os.path.join(graphs_dir, "*.txt"))
+        # 2. Find all txt files, sorted nicely (test1, test2, test10...)
+        with os.scandir(graphs_dir) as entries:
+            files = sorted((e.path for e in entries
+                            if e.is_file() and e.name.endswith('.txt')),
+                           key=_natural_key)
         if not files:
             messagebox.showerror("Error", "No .txt files found in graphs folder.")
             return
 
-        # Sort files nicely (test1, test2, test10...) instead of (test1, test10, test2)
-        try:
-            files.sort(key=lambda f: int(''.join(filter(str.isdigit, os.path.basename(f)))))
-        except:
-            files.sort()  # Fallback to alphabetical
-
         output_file = os.path.join(project_root, 'trace_execution.txt')
 
+        try:
+            f_out = open(output_file, 'w', encoding='utf-8')
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to write trace file:\n{e}")
+            return
+
         self.log(f"Generating traces for {len(files)} graphs...")
 
+        executor = ProcessPoolExecutor()
+        self.trace_jobs = deque(executor.submit(_trace_one, os.path.basename(f)) for f in files)
+        self.trace_file = f_out
+        executor.shutdown(wait=False)
+        self._poll_traces(f_out)
+
+    def _cancel_traces(self):
+        # Abandonne les calculs de traces en cours : ceux pas encore
+        # démarrés sont annulés, et le fichier temporaire de chacun des
+        # autres est supprimé dès qu'il est écrit (`_discard_trace`,
+        # appelé tout de suite pour un calcul déjà terminé). L'exécuteur
+        # n'acceptant plus de travail (`shutdown`), ses processus
+        # s'arrêtent une fois les calculs démarrés terminés
+        jobs = self.trace_jobs
+        if jobs is None:
+            return
+        self.trace_jobs = None
+        self.trace_file.close()
+        self.trace_file = None
+        for job in jobs:
+            job.cancel()
+            job.add_done_callback(_discard_trace)
+
+    def _poll_traces(self, f_out):
+        # Écrit (sans bloquer Tk) les traces dans l'ordre des fichiers :
+        # chacune dès que son calcul et tous les précédents sont
+        # terminés, son fichier temporaire étant supprimé aussitôt.
+        # Se reprogramme tant qu'il reste des calculs en cours
+        jobs = self.trace_jobs
         try:
-            with open(output_file, 'w', encoding='utf-8') as f_out:
-
-                for file_path in files:
-                    filename = os.path.basename(file_path)
-                    f_out.write(f"################### {filename} ###################\n")
+            while jobs and jobs[0].done():
+                filename, tmp_path = jobs.popleft().result()
+                self._append_trace(f_out, filename, tmp_path)
+        except Exception as e:
+            self._cancel_traces()
+            messagebox.showerror("Error", f"Failed to write trace file:\n{e}")
+            return
 
-                    g = Graph()
-                    success = g.load_from_file(filename)
+        if jobs:
+            self.root.after(100, self._poll_traces, f_out)
+            return
 
-                    if not success:
-                        f_out.write("Error: Could not load file.\n\n")
-                        continue
+        self.trace_jobs = None
+        self.trace_file = None
+        f_out.close()
+        self.log(f"Done! Trace saved to: {f_out.name}")
+        messagebox.showinfo("Success", f"Trace file generated:\n{f_out.name}")
 
-                    # Run and get detailed string
-                    trace_content = g.run_with_trace()
-                    f_out.write(trace_content)
-                    f_out.write("\n\n\n")
+    @staticmethod
+    def _append_trace(f_out, filename, tmp_path):
+        # Recopie dans `f_out` la trace d'un graphe (fichier temporaire
+        # écrit par `_trace_one`), puis supprime le fichier temporaire
+        f_out.write(f"################### {filename} ###################\n")
 
-            self.log(f"Done! Trace saved to: {output_file}")
-            messagebox.showinfo("Success", f"Trace file generated:\n{output_file}")
+        if tmp_path is None:
+            f_out.write("Error: Could not load file.\n\n")
+            return
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to write trace file:\n{e}")
+        try:
+            with open(tmp_path, encoding='utf-8') as f_in:
+                shutil.copyfileobj(f_in, f_out)
+        finally:
+            os.remove(tmp_path)
+        f_out.write("\n\n\n")
 
     def load_graph(self):
         filename = self.file_entry.get()
@@ -169,33 +302,12 @@ class FloydApp:
             self.log("\n!!! WARNING: NEGATIVE ABSORBING CIRCUIT !!!")
 
             cycle_path = self.graph.get_negative_cycle_path()
-            if not cycle_path:
-                # Tentative de reconstitution si la méthode
-                # `get_negative_cycle_path` n'a pas renvoyé de résultat.
-                # On essaie d'identifier deux sommets i,k tels que
-                # L[i][k] + L[k][i] < 0, puis on concatène les sous-chemins
-                # pour former un cycle. Cette logique ne garantit pas toujours un bon résultat.
-                n = self.graph.num_vertices
-                for i in range(n):
-                    if self.graph.L[i][i] < 0:
-                        for k in range(n):
-                            if i == k:
-                                continue
-                            if self.graph.L[i][k] != self.graph.INF and self.graph.L[k][i] != self.graph.INF:
-                                if self.graph.L[i][k] + self.graph.L[k][i] < 0:
-                                    _, p1 = self.graph.get_path(i, k)
-                                    _, p2 = self.graph.get_path(k, i)
-                                    if p1 and p2:
-                                        cycle_path = p1[:-1] + p2
-                                        break
-                        if cycle_path:
-                            break
 
             if cycle_path:
-                self.current_paths = [cycle_path]
+                self._set_current_paths([cycle_path])
                 self.log(f"Cycle Path: {cycle_path}")
             else:
-                self.current_paths = []
+                self._set_current_paths([])
                 self.log("Could not reconstruct exact cycle path.")
 
             self.draw_graph()
@@ -207,7 +319,7 @@ class FloydApp:
             self.log("\n--- READY ---")
             self.start_node = -1
             self.end_node = -1
-            self.current_paths = []
+            self._set_current_paths([])
             self.draw_graph()
 
     def show_all_paths_in_log(self):
@@ -228,9 +340,8 @@ class FloydApp:
                 if cost == self.graph.INF:
                     self.log(f"{start} -> {end}: NO PATH")
                 else:
-                    paths = self.graph.get_all_shortest_paths(start, end)
                     self.log(f"{start} -> {end} (Cost: {cost})")
-                    for p in paths:
+                    for p in self.graph.iter_paths(start, end):
                         self.log(f"   Route: {p}")
         self.log("==========================")
 
@@ -245,9 +356,30 @@ class FloydApp:
             self.node_positions.append((x, y))
 
     def draw_graph(self):
-        self.canvas.delete("all")
+        # Demande un redessin du canvas. Les demandes rapprochées (clics
+        # successifs, rechargement) sont regroupées en un seul rendu,
+        # exécuté quand Tk n'a plus d'événements à traiter.
+        if self.redraw_pending:
+            return
+        self.redraw_pending = True
+        self.root.after_idle(self._do_draw)
+
+    def _do_draw(self):
+        self.redraw_pending = False
         if not self.graph:
+            self.canvas.delete("all")
+            self.drawn_graph = None
             return
+        if self.drawn_graph is self.graph:
+            self._restyle_canvas()
+        else:
+            self._rebuild_canvas()
+
+    def _rebuild_canvas(self):
+        # Recrée tous les éléments du canvas pour le graphe courant
+        self.canvas.delete("all")
+        self.edge_items = {}
+        self.node_items = []
 
         n = self.graph.num_vertices
 
@@ -266,25 +398,70 @@ class FloydApp:
 
                     is_highlight = self.is_edge_in_any_path(i, j)
                     has_reverse = (adj[j][i] != self.graph.INF) if i != j else False
-                    self.draw_arrow(i, j, adj[i][j], is_highlight, offset=has_reverse)
+                    items = self.draw_arrow(i, j, adj[i][j], is_highlight, offset=has_reverse)
+                    self.edge_items[(i, j)] = (is_highlight, items)
 
+        negative = self.graph.has_negative_cycle()
         for i in range(n):
             x, y = self.node_positions[i]
             r = self.NODE_SIZE / 2
-            color, width = "white", 1
+            color, width = self._node_style(i, negative)
 
-            if self.graph.has_negative_cycle():
-                if self.is_node_in_any_path(i): color = "#ff9999"; width = 3
-            else:
-                if i == self.start_node:
-                    color = "#90ee90"; width = 3
-                elif i == self.end_node:
-                    color = "#ffcccb"; width = 3
-                elif self.is_node_in_any_path(i):
-                    color = "#fffacd"; width = 2
-
-            self.canvas.create_oval(x - r, y - r, x + r, y + r, fill=color, outline="black", width=width)
+            oval = self.canvas.create_oval(x - r, y - r, x + r, y + r, fill=color, outline="black", width=width)
             self.canvas.create_text(x, y, text=str(i), font=("Arial", 12, "bold"))
+            self.node_items.append(((color, width), oval))
+
+        self.drawn_graph = self.graph
+
+    def _restyle_canvas(self):
+        # Même graphe : seuls les chemins en surbrillance et la sélection
+        # ont pu changer, on ne reconfigure que les éléments concernés
+        for key, (was_highlight, items) in self.edge_items.items():
+            is_highlight = self.is_edge_in_any_path(*key)
+            if is_highlight != was_highlight:
+                self._style_edge(items, is_highlight)
+                self.edge_items[key] = (is_highlight, items)
+
+        negative = self.graph.has_negative_cycle()
+        for i, (style, oval) in enumerate(self.node_items):
+            new_style = self._node_style(i, negative)
+            if new_style != style:
+                color, width = new_style
+                self.canvas.itemconfigure(oval, fill=color, width=width)
+                self.node_items[i] = (new_style, oval)
+
+    def _node_style(self, i, negative):
+        # (couleur, épaisseur) du sommet i selon la sélection et les chemins
+        if negative:
+            if self.is_node_in_any_path(i): return "#ff9999", 3
+        else:
+            if i == self.start_node:
+                return "#90ee90", 3
+            elif i == self.end_node:
+                return "#ffcccb", 3
+            elif self.is_node_in_any_path(i):
+                return "#fffacd", 2
+        return "white", 1
+
+    @staticmethod
+    def _edge_colors(highlight):
+        # (couleur du trait, épaisseur, fond et texte de l'étiquette)
+        if highlight:
+            return "red", 3, "red", "white"
+        return "#666", 1, "#eee", "black"
+
+    def _style_edge(self, items, highlight):
+        # Applique le style (normal / surbrillance) aux éléments d'une
+        # arête renvoyés par `draw_arrow` ou `draw_self_loop`
+        stroke, head, rect, text = items
+        color, width, bg, fg = self._edge_colors(highlight)
+        if head is None:
+            self.canvas.itemconfigure(stroke, fill=color, width=width)
+        else:
+            self.canvas.itemconfigure(stroke, outline=color, width=width)
+            self.canvas.itemconfigure(head, fill=color)
+        self.canvas.itemconfigure(rect, fill=bg)
+        self.canvas.itemconfigure(text, fill=fg)
 
     def draw_arrow(self, u, v, weight, highlight, offset=False):
         x1, y1 = self.node_positions[u]
@@ -295,8 +472,7 @@ class FloydApp:
         dist = math.hypot(dx, dy)
 
         if dist == 0:
-            self.draw_self_loop(u, weight, highlight)
-            return
+            return self.draw_self_loop(u, weight, highlight)
 
         ux, uy = dx / dist, dy / dist
         px, py = -uy, ux
@@ -307,18 +483,16 @@ class FloydApp:
         end_x = x2 + px * shift - ux * r
         end_y = y2 + py * shift - uy * r
 
-        color = "red" if highlight else "#666"
-        width = 3 if highlight else 1
+        color, width, bg, fg = self._edge_colors(highlight)
 
-        self.canvas.create_line(start_x, start_y, end_x, end_y, fill=color, width=width, arrow=tk.LAST,
-                                arrowshape=(10, 12, 5))
+        line = self.canvas.create_line(start_x, start_y, end_x, end_y, fill=color, width=width, arrow=tk.LAST,
+                                       arrowshape=(10, 12, 5))
 
         mid_x, mid_y = (start_x + end_x) / 2, (start_y + end_y) / 2
-        bg = "red" if highlight else "#eee"
-        fg = "white" if highlight else "black"
 
-        self.canvas.create_rectangle(mid_x - 10, mid_y - 8, mid_x + 10, mid_y + 8, fill=bg, outline="")
-        self.canvas.create_text(mid_x, mid_y, text=str(weight), fill=fg, font=("Arial", 9, "bold"))
+        rect = self.canvas.create_rectangle(mid_x - 10, mid_y - 8, mid_x + 10, mid_y + 8, fill=bg, outline="")
+        text = self.canvas.create_text(mid_x, mid_y, text=str(weight), fill=fg, font=("Arial", 9, "bold"))
+        return line, None, rect, text
 
     def draw_self_loop(self, u, weight, highlight):
         x, y = self.node_positions[u]
@@ -336,10 +510,9 @@ class FloydApp:
         loop_r = 25
         lcx, lcy = x + nx * (r + loop_r), y + ny * (r + loop_r)
 
-        color = "red" if highlight else "#666"
-        width = 3 if highlight else 1
+        color, width, bg, fg = self._edge_colors(highlight)
 
-        self.canvas.create_oval(lcx - loop_r, lcy - loop_r, lcx + loop_r, lcy + loop_r, outline=color, width=width)
+        loop = self.canvas.create_oval(lcx - loop_r, lcy - loop_r, lcx + loop_r, lcy + loop_r, outline=color, width=width)
 
         arrow_len = 10
         px, py = -ny, nx
@@ -348,24 +521,30 @@ class FloydApp:
         left_x, left_y = base_x + px * 4, base_y + py * 4
         right_x, right_y = base_x - px * 4, base_y - py * 4
 
-        self.canvas.create_polygon(tip_x, tip_y, left_x, left_y, right_x, right_y, fill=color)
+        head = self.canvas.create_polygon(tip_x, tip_y, left_x, left_y, right_x, right_y, fill=color)
 
         tx, ty = x + nx * (r + loop_r * 2 + 10), y + ny * (r + loop_r * 2 + 10)
-        bg = "red" if highlight else "#eee"
-        fg = "white" if highlight else "black"
-        self.canvas.create_rectangle(tx - 10, ty - 8, tx + 10, ty + 8, fill=bg, outline="")
-        self.canvas.create_text(tx, ty, text=str(weight), fill=fg, font=("Arial", 9, "bold"))
+        rect = self.canvas.create_rectangle(tx - 10, ty - 8, tx + 10, ty + 8, fill=bg, outline="")
+        text = self.canvas.create_text(tx, ty, text=str(weight), fill=fg, font=("Arial", 9, "bold"))
+        return loop, head, rect, text
+
+    def _set_current_paths(self, paths):
+        # Change les chemins en surbrillance et précalcule leurs sommets et
+        # arêtes, pour que `draw_graph` les teste en O(1) au lieu de
+        # reparcourir les chemins. Toute affectation de `current_paths`
+        # passe par ici, afin que `hl_nodes` / `hl_edges` suivent
+        self.current_paths = paths
+        self.hl_nodes = set()
+        self.hl_edges = set()
+        for path in self.current_paths:
+            self.hl_nodes.update(path)
+            self.hl_edges.update(zip(path, path[1:]))
 
     def is_edge_in_any_path(self, u, v):
-        for path in self.current_paths:
-            for k in range(len(path) - 1):
-                if path[k] == u and path[k + 1] == v: return True
-        return False
+        return (u, v) in self.hl_edges
 
     def is_node_in_any_path(self, u):
-        for path in self.current_paths:
-            if u in path: return True
-        return False
+        return u in self.hl_nodes
 
     def on_canvas_click(self, event):
         if not self.graph: return
@@ -395,7 +574,7 @@ class FloydApp:
             else:
                 self.start_node = clicked
                 self.end_node = -1
-                self.current_paths = []
+                self._set_current_paths([])
                 self.log(f"\nNew Start: {clicked}")
             self.draw_graph()
 
@@ -406,10 +585,10 @@ class FloydApp:
         self.log(f"End: {self.end_node}")
         cost = self.graph.L[self.start_node][self.end_node]
         if paths:
-            self.current_paths = paths
+            self._set_current_paths(paths)
             self.log(f"Found {len(paths)} optimal path(s). Cost: {cost}")
             for p in paths:
                 self.log(f"Route: {p}")
         else:
-            self.current_paths = []
+            self._set_current_paths([])
             self.log("NO PATH.")